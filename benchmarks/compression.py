@@ -0,0 +1,60 @@
+"""
+    Compression benchmark: bytes on the wire and latency of the catalog operations with and without gzip.
+
+    Runs against the local stand-in server over a simulated slow link. Run from the repository root:
+
+        python -m benchmarks.compression [calls] [bandwidth in bytes per second]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sythonlab_cubacel_sdk.sdk import CubacelSDK
+from tests.server import CubacelStandInServer
+
+OPERATIONS = ('get_offices', 'get_nationalities', 'get_services')
+SCENARIOS = (
+    ('plain', False, '0'),
+    ('gzip responses', True, '0'),
+    ('gzip both ways', True, '1'),
+)
+
+
+def run(name, compress_responses, compress_requests, calls, bandwidth, config):
+    with CubacelStandInServer(compress=compress_responses, bandwidth=bandwidth) as server:
+        os.environ.update(CUBACEL_HOST=server.host, CUBACEL_COMPRESS_REQUESTS=compress_requests)
+        sdk = CubacelSDK(custom_config_file=config)
+        sdk.warmup()
+
+        latencies = {}
+        for operation in OPERATIONS:
+            samples = []
+            for _ in range(calls):
+                start = time.perf_counter()
+                getattr(sdk, operation)()
+                samples.append(time.perf_counter() - start)
+            latencies[operation] = statistics.median(samples) * 1000
+
+    stats = sdk.get_traffic_stats()
+    for operation in ('wsdl',) + OPERATIONS:
+        requests = stats[operation]['requests']
+        latency = f'{latencies[operation]:>12.1f}' if operation in latencies else f'{"-":>12}'
+        print(f'{name:16}{operation:20}{stats[operation]["sent_bytes"] / requests:>10.0f}'
+              f'{stats[operation]["received_bytes"] / requests:>12.0f}{latency}')
+
+
+def main(calls=10, bandwidth=256 * 1024):
+    os.environ.update(CUBACEL_USERNAME='user', CUBACEL_PASSWORD='secret')
+    print(f'{calls} calls per operation, link of {bandwidth} bytes/s, bytes and median milliseconds per call')
+    print(f'{"scenario":16}{"operation":20}{"sent":>10}{"received":>12}{"latency":>12}')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, compress_responses, compress_requests in SCENARIOS:
+            run(name, compress_responses, compress_requests, calls, bandwidth, Path(tmp) / 'cubacel.json')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,56 @@
+"""
+    Startup benchmark: import the SDK and create CubacelSDK(), with and without warmup().
+
+    Every run is a fresh interpreter against the local stand-in server. Run from the repository root:
+
+        python -m benchmarks.startup [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from tests.server import CubacelStandInServer
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+from sythonlab_cubacel_sdk.sdk import CubacelSDK
+imported = time.perf_counter()
+sdk = CubacelSDK(custom_config_file=__import__('pathlib').Path({config!r}))
+created = time.perf_counter()
+if {warmup}:
+    sdk.warmup()
+print(imported - start, created - start, time.perf_counter() - start)
+"""
+
+
+def measure(host, config, warmup, runs):
+    env = dict(os.environ, CUBACEL_HOST=host, CUBACEL_USERNAME='user', CUBACEL_PASSWORD='secret')
+    root = Path(__file__).resolve().parent.parent
+    samples = []
+
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', SNIPPET.format(config=config, warmup=warmup)], env=env,
+                                cwd=root, capture_output=True, text=True, check=True).stdout
+        samples.append([float(value) for value in output.split()])
+
+    return [statistics.median(column) * 1000 for column in zip(*samples)]
+
+
+def main(runs=10):
+    with CubacelStandInServer() as server, tempfile.TemporaryDirectory() as tmp:
+        config = str(Path(tmp) / 'cubacel.json')
+        lazy = measure(server.host, config, False, runs)
+        warm = measure(server.host, config, True, runs)
+
+    print(f'median of {runs} runs, milliseconds')
+    print(f'{"":24}{"import":>10}{"+ CubacelSDK()":>16}{"+ warmup()":>12}')
+    print(f'{"lazy (default)":24}{lazy[0]:>10.1f}{lazy[1]:>16.1f}{"-":>12}')
+    print(f'{"warmup()":24}{warm[0]:>10.1f}{warm[1]:>16.1f}{warm[2]:>12.1f}')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
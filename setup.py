@@ -3,7 +3,7 @@ from setuptools import setup, find_packages
 setup(
     name='sythonlab_cubacel_sdk',
     version='1.0.0',
-    packages=find_packages(),
+    packages=find_packages(exclude=('tests', 'tests.*', 'benchmarks', 'benchmarks.*')),
     install_requires=[
         'requests',
         'zeep',
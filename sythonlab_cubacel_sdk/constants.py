@@ -17,3 +17,16 @@ class ActionsEnum(Enum):
     SALE_SIM_TUR_CARD = 'sale_sim_tur_card'
     GET_IDENTIFICATION_TYPES = 'get_identification_types'
     CANCEL_SALE = 'cancel_sale'
+
+
+# Operations that only read state on the Cubacel host and are therefore safe to send more than once.
+READ_ONLY_ACTIONS = frozenset({
+    ActionsEnum.GET_SERVICES.value,
+    ActionsEnum.GET_PROVINCES.value,
+    ActionsEnum.GET_NATIONALITIES.value,
+    ActionsEnum.GET_OFFICES.value,
+    ActionsEnum.GET_SALE.value,
+    ActionsEnum.GET_BALANCE.value,
+    ActionsEnum.GET_BATCH_SALE.value,
+    ActionsEnum.GET_IDENTIFICATION_TYPES.value,
+})
@@ -0,0 +1,128 @@
+import contextvars
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class HedgePolicy:
+    """
+        Send a second identical request when the first one is slower than expected.
+
+        Only read-only operations must be passed to this policy. The hedge is sent after a
+        fixed delay or, when no delay is configured, after the given percentile of the latencies
+        observed for the same action, counted from the moment the request is sent. The first
+        successful response wins; the other request is left to finish in the background and its
+        result is discarded.
+
+        Requests never wait for a worker: when every worker is busy the request is sent from the
+        caller's thread without hedging, and a hedge is skipped if no worker is free for it.
+
+        Args:
+            delay (float, optional): Seconds to wait before hedging. If None, the delay is adaptive.
+            percentile (float): Percentile of observed latency used as adaptive delay.
+            max_extra_ratio (float): Maximum number of hedges as a fraction of the requests made.
+            min_samples (int): Samples needed per action before the adaptive delay is used.
+            window (int): Number of latency samples kept per action.
+            max_workers (int): Threads used to run hedged requests and their hedges.
+    """
+
+    def __init__(self, delay=None, percentile=95, max_extra_ratio=0.1, min_samples=20, window=200, max_workers=16):
+        self.delay = delay
+        self.percentile = percentile
+        self.max_extra_ratio = max_extra_ratio
+        self.min_samples = min_samples
+        self.requests = 0
+        self.hedges = 0
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cubacel-hedge')
+
+    def get_delay(self, action):
+        if self.delay is not None:
+            return self.delay
+
+        with self._lock:
+            samples = sorted(self._latencies[action])
+
+        if len(samples) < self.min_samples:
+            return None
+
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return samples[index]
+
+    def record(self, action, elapsed):
+        with self._lock:
+            self._latencies[action].append(elapsed)
+
+    def _acquire_hedge(self):
+        with self._lock:
+            if self.hedges + 1 > self.requests * self.max_extra_ratio:
+                return False
+            self.hedges += 1
+            return True
+
+    def _release_hedge(self):
+        with self._lock:
+            self.hedges -= 1
+
+    def _try_submit(self, func, data):
+        """
+            Run func on a free worker. Returns (future, sent event), or (None, None) when every worker is busy.
+        """
+        if not self._slots.acquire(blocking=False):
+            return None, None
+
+        sent = threading.Event()
+        # Run in a copy of the caller's context so per-operation tracking follows the request.
+        context = contextvars.copy_context()
+
+        def run():
+            sent.set()
+            try:
+                return context.run(func, **data)
+            finally:
+                self._slots.release()
+
+        return self._executor.submit(run), sent
+
+    def call(self, action, func, data):
+        with self._lock:
+            self.requests += 1
+
+        delay = self.get_delay(action)
+        primary = None
+        if delay is not None:
+            primary, sent = self._try_submit(func, data)
+
+        if primary is None:
+            start = time.monotonic()
+            response = func(**data)
+            self.record(action, time.monotonic() - start)
+            return response
+
+        sent.wait()
+        start = time.monotonic()
+        futures = [primary]
+        done, _ = wait(futures, timeout=delay)
+
+        if not done and self._acquire_hedge():
+            hedge, _ = self._try_submit(func, data)
+            if hedge is None:
+                self._release_hedge()
+            else:
+                futures.append(hedge)
+
+        errors = []
+        pending = list(futures)
+        while pending:
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            pending = list(not_done)
+            for future in done:
+                if future.exception() is None:
+                    self.record(action, time.monotonic() - start)
+                    return future.result()
+                errors.append(future.exception())
+
+        raise errors[0]
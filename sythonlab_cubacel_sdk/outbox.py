@@ -0,0 +1,284 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sythonlab_cubacel_sdk.recording import serialize
+
+PENDING = 'pending'
+PROCESSING = 'processing'
+DONE = 'done'
+FAILED = 'failed'
+
+logger = logging.getLogger(__name__)
+
+
+class OperationQueue:
+    """
+        Durable store-and-forward queue for recharges and SIM Tur card sales.
+
+        Operations are saved in a SQLite file and answered right away with their transaction ID.
+        A background drainer sends them through the SDK in batches, paced to the host: a batch
+        with errors pauses the drainer with exponential backoff, and failed operations are retried
+        with the same transaction ID, at most every retry_delay * 64 seconds, until they are max_age
+        seconds old or max_attempts is reached. By default an operation is retried for a day, so
+        it survives long outages of the host. Results can be polled with
+        get_result or received through a callback.
+
+        Several processes can share the same file: operations are claimed inside a write
+        transaction, so each one is sent by a single process. A claimed operation is leased for
+        lease seconds; if its process dies before finishing it, another one sends it again with the
+        same transaction ID once the lease expires. The lease must be longer than the slowest call.
+
+        Args:
+            sdk (CubacelSDK): SDK instance used to send the operations.
+            path (str or Path): SQLite file where operations are stored.
+            batch_size (int): Maximum number of operations sent per batch.
+            concurrency (int): Operations of a batch sent in parallel.
+            interval (float): Seconds between batches.
+            retry_delay (float): Base delay in seconds for retries and backoff.
+            max_attempts (int, optional): Attempts before an operation is marked as failed. None, the
+                default, does not limit the attempts.
+            max_age (float, optional): Seconds since it was queued after which a failed attempt marks
+                the operation as failed. Defaults to one day; None retries until the host answers.
+            callback (callable, optional): Called as callback(transaction_id, result) once an
+                operation is done or failed. Exceptions raised by it are logged and ignored.
+            lease (float): Seconds a claimed operation stays reserved for the process sending it.
+
+        Example:
+            queue = OperationQueue(CubacelSDK())
+            queue.start()
+            transaction_id = queue.recharge(phone_number='+5351234567', price=10.0, product_code=101)
+            print(queue.get_result(transaction_id))
+    """
+    METHODS = ('recharge', 'sale_sim_tur_card')
+
+    def __init__(self, sdk, path='cubacel_queue.sqlite3', batch_size=10, concurrency=1, interval=1.0,
+                 retry_delay=5.0, max_attempts=None, max_age=86400.0, callback=None, lease=300.0):
+        self.sdk = sdk
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.interval = interval
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self.max_age = max_age
+        self.callback = callback
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._backoff = 0
+
+        # Autocommit mode, so claims can open their own BEGIN IMMEDIATE transaction.
+        self._db = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS operations (
+                    transaction_id TEXT PRIMARY KEY,
+                    method TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    claim TEXT,
+                    lease_until REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._db.execute('CREATE INDEX IF NOT EXISTS operations_status ON operations (status, next_attempt_at)')
+
+    def enqueue(self, method, **kwargs):
+        if method not in self.METHODS:
+            raise ValueError(f'[ERROR] - Operation {method} can not be queued')
+
+        if not kwargs.get('transaction_id'):
+            kwargs['transaction_id'] = self.sdk.get_transaction_id()
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO operations (transaction_id, method, payload, status, next_attempt_at, created_at, '
+                'updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (kwargs['transaction_id'], method, json.dumps(kwargs), PENDING, now, now, now)
+            )
+
+        return kwargs['transaction_id']
+
+    def recharge(self, phone_number, price, product_code, transaction_id=None):
+        """
+            Queue a recharge. Takes the same arguments as CubacelSDK.recharge.
+
+            Returns:
+                str: The transaction ID of the queued recharge.
+        """
+        return self.enqueue('recharge', phone_number=phone_number, price=price, product_code=product_code,
+                            transaction_id=transaction_id)
+
+    def sale_sim_tur_card(self, arrival_date, birth_date, document_number, name, last_name, gender, address, iccid,
+                          nationality_id, transaction_id=None):
+        """
+            Queue a SIM Tur card sale. Takes the same arguments as CubacelSDK.sale_sim_tur_card.
+
+            Returns:
+                str: The transaction ID of the queued sale.
+        """
+        return self.enqueue('sale_sim_tur_card', arrival_date=arrival_date, birth_date=birth_date,
+                            document_number=document_number, name=name, last_name=last_name, gender=gender,
+                            address=address, iccid=iccid, nationality_id=nationality_id,
+                            transaction_id=transaction_id)
+
+    def get_result(self, transaction_id):
+        """
+            Return the state of a queued operation.
+
+            Returns:
+                dict or None: A dictionary containing:
+                    - status (str): 'pending', 'processing', 'done' or 'failed'.
+                    - attempts (int): Number of times the operation was sent.
+                    - result (dict, optional): Result of the SDK method once sent.
+                    - error (str, optional): Last error raised while sending it.
+                None if the transaction ID is unknown.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT status, attempts, result, error FROM operations WHERE transaction_id = ?', (transaction_id,)
+            ).fetchone()
+
+        if not row:
+            return None
+
+        return {
+            'status': row[0],
+            'attempts': row[1],
+            'result': json.loads(row[2]) if row[2] else None,
+            'error': row[3],
+        }
+
+    def _claim(self):
+        now = time.time()
+        claim = uuid.uuid4().hex
+
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock before reading, so no other process can claim the same rows.
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._db.execute(
+                    'SELECT transaction_id, method, payload, attempts, created_at FROM operations '
+                    'WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND lease_until <= ?) '
+                    'ORDER BY created_at LIMIT ?',
+                    (PENDING, now, PROCESSING, now, self.batch_size)
+                ).fetchall()
+                self._db.executemany(
+                    'UPDATE operations SET status = ?, claim = ?, lease_until = ?, updated_at = ? '
+                    'WHERE transaction_id = ?',
+                    [(PROCESSING, claim, now + self.lease, now, row[0]) for row in rows]
+                )
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+        return [row + (claim,) for row in rows]
+
+    def _finish(self, transaction_id, claim, **values):
+        values.update(claim=None, lease_until=None, updated_at=time.time())
+        columns = ', '.join(f'{column} = ?' for column in values)
+
+        # The claim check keeps a process whose lease expired from overwriting the new owner's state.
+        with self._lock:
+            self._db.execute(
+                f'UPDATE operations SET {columns} WHERE transaction_id = ? AND claim = ?',
+                tuple(values.values()) + (transaction_id, claim)
+            )
+
+    def _notify(self, transaction_id):
+        if not self.callback:
+            return
+
+        try:
+            self.callback(transaction_id, self.get_result(transaction_id))
+        except Exception:
+            logger.exception('[ERROR] - Queue callback failed for transaction %s', transaction_id)
+
+    def _send(self, row):
+        transaction_id, method, payload, attempts, created_at, claim = row
+        attempts += 1
+
+        try:
+            result = getattr(self.sdk, method)(**json.loads(payload))
+        except Exception as e:
+            failed = (
+                (self.max_attempts is not None and attempts >= self.max_attempts)
+                or (self.max_age is not None and time.time() - created_at >= self.max_age)
+            )
+            self._finish(
+                transaction_id, claim,
+                status=FAILED if failed else PENDING,
+                attempts=attempts,
+                next_attempt_at=time.time() + self.retry_delay * 2 ** min(attempts - 1, 6),
+                error=str(e)
+            )
+
+            if failed:
+                self._notify(transaction_id)
+            return False
+
+        self._finish(transaction_id, claim, status=DONE, attempts=attempts, result=json.dumps(serialize(result)),
+                     error=None)
+        self._notify(transaction_id)
+        return True
+
+    def drain_once(self):
+        """
+            Send one batch of due operations.
+
+            Returns:
+                int: Number of operations sent successfully.
+        """
+        rows = self._claim()
+        if not rows:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            sent = list(executor.map(self._send, rows))
+
+        self._backoff = 0 if all(sent) else self._backoff + 1
+        return sum(sent)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.drain_once()
+            except Exception:
+                logger.exception('[ERROR] - Queue drainer failed, retrying')
+                self._backoff += 1
+
+            delay = self.interval
+            if self._backoff:
+                delay += self.retry_delay * 2 ** min(self._backoff - 1, 6)
+            self._stop.wait(delay)
+
+    def start(self):
+        """
+            Start the background drainer thread.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='cubacel-queue', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+            Stop the background drainer after the batch in progress.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
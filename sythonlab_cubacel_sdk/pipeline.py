@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sythonlab_cubacel_sdk.recording import serialize
+
+
+class BatchSimPipeline:
+    """
+        Request a batch of SIM Tur cards, wait for its delivery and register every card.
+
+        The stages run in order: request_batch (checked against CUBACEL_MIN_BATCH_SIMTUR and
+        CUBACEL_MAX_BATCH_SIMTUR), get_batch_sale polling until the batch reaches one of
+        ready_statuses, and sale_sim_tur_card for every ICCID with bounded parallelism and per-card
+        retry. Progress is saved to a JSON checkpoint after every step, so running the pipeline
+        again with the same checkpoint resumes it: the batch is not requested twice and cards
+        already registered are skipped.
+
+        Only errors raised while calling the host are retried, reusing the card's transaction ID in
+        case the failed call reached the host. A card rejected by the host (done is False) is marked
+        as failed straight away and gets a new transaction ID if the pipeline is run again. The
+        batch request follows the same rule.
+
+        Args:
+            sdk (CubacelSDK): SDK instance, shared by all the worker threads.
+            checkpoint_path (str or Path): JSON file where progress is saved.
+            concurrency (int): Cards registered in parallel.
+            max_attempts (int): Attempts per card before giving up on it.
+            retry_delay (float): Base delay in seconds between attempts of a card, doubled each time.
+            poll_interval (float): Seconds between get_batch_sale calls. Calls that raise are retried.
+            poll_timeout (float, optional): Seconds to wait for the batch before raising TimeoutError.
+                Defaults to one day; None waits forever.
+            ready_statuses (iterable): Batch statuses that allow registering the cards.
+            failed_statuses (iterable): Batch statuses that abort the pipeline.
+
+        Example:
+            pipeline = BatchSimPipeline(CubacelSDK(), 'batch_checkpoint.json', concurrency=16)
+            report = pipeline.run(
+                package_id=123,
+                commercial_office_id=10,
+                delivery_date='2025-08-01',
+                cards=[{
+                    'iccid': '8901234567890123456',
+                    'arrival_date': '2025-07-26',
+                    'birth_date': '1980-01-01',
+                    'document_number': 'A1234567',
+                    'name': 'John',
+                    'last_name': 'Doe',
+                    'gender': 'M',
+                    'address': '123 Main St',
+                    'nationality_id': 10
+                }]
+            )
+            for card in report['cards']:
+                print(card['iccid'], card['status'])
+    """
+
+    def __init__(self, sdk, checkpoint_path, concurrency=8, max_attempts=3, retry_delay=2.0, poll_interval=30.0,
+                 poll_timeout=86400.0, ready_statuses=('delivered',), failed_statuses=('cancelled', 'canceled')):
+        self.sdk = sdk
+        self.checkpoint_path = Path(checkpoint_path)
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.poll_timeout = poll_timeout
+        self.ready_statuses = set(ready_statuses)
+        self.failed_statuses = set(failed_statuses)
+        self._lock = threading.Lock()
+        self.state = self._load()
+
+    def _load(self):
+        if self.checkpoint_path.exists():
+            with self.checkpoint_path.open('r') as f:
+                return json.load(f)
+        return {'order_id': None, 'transaction_id': None, 'batch_status': None, 'cards': {}}
+
+    def _save(self):
+        with self._lock:
+            tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+            with tmp_path.open('w') as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(tmp_path, self.checkpoint_path)
+
+    def _new_transaction_id(self):
+        used = {card['transaction_id'] for card in self.state['cards'].values()}
+        used.add(self.state['transaction_id'])
+
+        # get_transaction_id is timestamp based, so consecutive calls can return the same value.
+        transaction_id = self.sdk.get_transaction_id()
+        while transaction_id in used:
+            time.sleep(0.000001)
+            transaction_id = self.sdk.get_transaction_id()
+        return transaction_id
+
+    def validate(self, qty):
+        min_qty = self.sdk.CONFIG.MIN_BATCH_SIM_TUR
+        max_qty = self.sdk.CONFIG.MAX_BATCH_SIM_TUR
+
+        if min_qty and qty < int(min_qty):
+            raise ValueError(f'[ERROR] - Batch of {qty} cards is below the minimum of {min_qty}')
+        if max_qty and qty > int(max_qty):
+            raise ValueError(f'[ERROR] - Batch of {qty} cards is above the maximum of {max_qty}')
+
+    def request(self, package_id, qty, commercial_office_id, delivery_date):
+        if self.state['order_id']:
+            return self.state['order_id']
+
+        self.validate(qty)
+
+        if not self.state['transaction_id']:
+            self.state['transaction_id'] = self._new_transaction_id()
+            self._save()
+
+        result = self.sdk.request_batch(package_id, qty, commercial_office_id, delivery_date,
+                                        self.state['transaction_id'])
+        if not result['done']:
+            # The host answered: a rerun needs a new transaction ID, reusing this one gets the same rejection.
+            self.state['transaction_id'] = None
+            self._save()
+            raise Exception(f'[ERROR] - Batch request failed: {serialize(result["response"])}')
+
+        self.state['order_id'] = result['response']['OrderId']
+        self._save()
+        return self.state['order_id']
+
+    def wait(self):
+        if self.state['batch_status'] in self.ready_statuses:
+            return self.state['batch_status']
+
+        start = time.monotonic()
+        while True:
+            try:
+                result = self.sdk.get_batch_sale(self.state['order_id'], self._new_transaction_id())
+            except Exception as e:
+                print(f'[ERROR] - Polling batch {self.state["order_id"]} failed, retrying: {e}')
+                result = {'done': False}
+
+            if result['done']:
+                self.state['batch_status'] = result['response']['Status']
+                self._save()
+
+                if self.state['batch_status'] in self.ready_statuses:
+                    return self.state['batch_status']
+                if self.state['batch_status'] in self.failed_statuses:
+                    raise Exception(f'[ERROR] - Batch {self.state["order_id"]} is {self.state["batch_status"]}')
+
+            if self.poll_timeout is not None and time.monotonic() - start >= self.poll_timeout:
+                raise TimeoutError(f'[ERROR] - Batch {self.state["order_id"]} was not delivered in time')
+
+            time.sleep(self.poll_interval)
+
+    def _register(self, card):
+        entry = self.state['cards'][card['iccid']]
+
+        while entry['attempts'] < self.max_attempts:
+            with self._lock:
+                entry['attempts'] += 1
+
+            try:
+                result = self.sdk.sale_sim_tur_card(transaction_id=entry['transaction_id'], **card)
+            except Exception as e:
+                with self._lock:
+                    entry['error'] = str(e)
+                self._save()
+
+                if entry['attempts'] < self.max_attempts:
+                    time.sleep(self.retry_delay * 2 ** (entry['attempts'] - 1))
+                continue
+
+            with self._lock:
+                if result['done']:
+                    entry.update({'status': 'done', 'order_id': result['order_id'], 'error': None})
+                else:
+                    # The host answered: retrying with the same transaction ID gets the same rejection.
+                    entry.update({'status': 'failed', 'rejected': True,
+                                  'error': json.dumps(serialize(result['response']), default=str)})
+            self._save()
+            return
+
+        with self._lock:
+            entry['status'] = 'failed'
+        self._save()
+
+    def register(self, cards):
+        for card in cards:
+            if card['iccid'] not in self.state['cards']:
+                self.state['cards'][card['iccid']] = {
+                    'status': 'pending',
+                    'attempts': 0,
+                    'transaction_id': self._new_transaction_id(),
+                    'order_id': None,
+                    'error': None,
+                    'rejected': False,
+                }
+            elif self.state['cards'][card['iccid']]['status'] == 'failed':
+                # A new run gives previously failed cards a fresh set of attempts. Cards the host rejected
+                # need a new transaction ID; the others keep theirs in case a failed call reached the host.
+                entry = self.state['cards'][card['iccid']]
+                if entry.get('rejected'):
+                    entry.update({'transaction_id': self._new_transaction_id(), 'rejected': False})
+                entry.update({'status': 'pending', 'attempts': 0})
+        self._save()
+
+        pending = [card for card in cards if self.state['cards'][card['iccid']]['status'] != 'done']
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            list(executor.map(self._register, pending))
+
+    def report(self):
+        return {
+            'order_id': self.state['order_id'],
+            'transaction_id': self.state['transaction_id'],
+            'batch_status': self.state['batch_status'],
+            'cards': [dict(iccid=iccid, **entry) for iccid, entry in self.state['cards'].items()],
+        }
+
+    def run(self, package_id, commercial_office_id, delivery_date, cards):
+        """
+            Run every stage of the pipeline, resuming from the checkpoint if there is one.
+
+            Args:
+                package_id (int): The ID of the package to request.
+                commercial_office_id (int): ID of the commercial office placing the request.
+                delivery_date (str): Date when the batch should be delivered (format 'YYYY-MM-DD').
+                cards (list of dict): One dict per card with the arguments of
+                    CubacelSDK.sale_sim_tur_card except transaction_id. The batch quantity is its length.
+
+            Returns:
+                dict: A dictionary containing:
+                    - order_id (int): The order ID of the batch.
+                    - transaction_id (str): The transaction ID of the batch request.
+                    - batch_status (str): Last status reported for the batch.
+                    - cards (list of dict): One entry per card with iccid, status ('done', 'failed', 'pending'),
+                      attempts, transaction_id, order_id, the last error and whether the host rejected it.
+        """
+        self.request(package_id, len(cards), commercial_office_id, delivery_date)
+        self.wait()
+        self.register(cards)
+        return self.report()
@@ -0,0 +1,160 @@
+import datetime
+import gzip
+import json
+import threading
+import time
+import weakref
+from collections import defaultdict, deque
+from decimal import Decimal
+
+REDACTED = '***'
+REDACTED_KEYS = {'SessionTicket', 'Ticket', 'AccountId', 'Password', 'OldPassword', 'NewPassword'}
+
+# Values JSON can not represent are stored as {TYPE_KEY: name, 'value': text} when recording, so replay rebuilds them
+# with the same type the live response had. Order matters: datetime is a subclass of date.
+TYPE_KEY = '__type__'
+TYPES = (
+    ('decimal', Decimal, str, Decimal),
+    ('datetime', datetime.datetime, datetime.datetime.isoformat, datetime.datetime.fromisoformat),
+    ('date', datetime.date, datetime.date.isoformat, datetime.date.fromisoformat),
+    ('time', datetime.time, datetime.time.isoformat, datetime.time.fromisoformat),
+)
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {k: REDACTED if k in REDACTED_KEYS else redact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+def serialize(value, typed=False):
+    """
+        Convert a zeep response or request data to JSON compatible values.
+
+        With typed, Decimal and date/time values are tagged so that RecordedResponse.build can restore
+        them; otherwise they become strings.
+    """
+    if hasattr(value, '__values__'):
+        from zeep.helpers import serialize_object
+        value = serialize_object(value, dict)
+    if isinstance(value, dict):
+        return {k: serialize(v, typed) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [serialize(item, typed) for item in value]
+    if typed:
+        for name, cls, dump, _ in TYPES:
+            if isinstance(value, cls):
+                return {TYPE_KEY: name, 'value': dump(value)}
+    return json.loads(json.dumps(value, default=str))
+
+
+class RecordedResponse(dict):
+    """
+        Replayed response that, like zeep objects, allows attribute and item access.
+    """
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    @classmethod
+    def build(cls, value):
+        if isinstance(value, dict) and TYPE_KEY in value:
+            load = next(load for name, _, _, load in TYPES if name == value[TYPE_KEY])
+            return load(value['value'])
+        if isinstance(value, dict):
+            return cls({k: cls.build(v) for k, v in value.items()})
+        if isinstance(value, list):
+            return [cls.build(item) for item in value]
+        return value
+
+
+class TrafficRecorder:
+    """
+        Record the SOAP traffic going through CubacelSDK.execute or replay it offline.
+
+        Recordings are stored as JSON lines, one per call, in a single gzip stream that stays open
+        until close() is called, with credentials and session tickets redacted. Starting a recording
+        replaces the file unless append is set. In replay mode the recordings of every action are served in the
+        order they were recorded, regardless of the request data, so transaction IDs generated at
+        replay time do not need to match.
+
+        Args:
+            path (str or Path): File where recordings are written or read.
+            mode (str): 'record' or 'replay'.
+            latency_scale (float): Factor applied to recorded latencies on replay. 0 disables waiting.
+            append (bool): Add the recording to an existing file instead of replacing it.
+    """
+    RECORD = 'record'
+    REPLAY = 'replay'
+
+    def __init__(self, path, mode, latency_scale=1.0, append=False):
+        if mode not in (self.RECORD, self.REPLAY):
+            raise ValueError(f'[ERROR] - Invalid transport mode: {mode}')
+
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._recordings = defaultdict(deque)
+        self._file = None
+
+        if not self.replaying:
+            self._file = gzip.open(self.path, 'at' if append else 'wt', encoding='utf-8')
+            self._finalizer = weakref.finalize(self, self._file.close)
+
+        if self.replaying:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._recordings[entry['action']].append(entry)
+
+    @property
+    def replaying(self):
+        return self.mode == self.REPLAY
+
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        """
+            Finish the gzip stream of a recording. Recorded calls are only guaranteed to be on disk after it.
+        """
+        if self._file:
+            with self._lock:
+                self._finalizer()
+
+    def record(self, action, data, send):
+        entry = {'action': action, 'request': redact(serialize(data, typed=True)), 'started': time.time()}
+        start = time.monotonic()
+
+        try:
+            response = send()
+        except Exception as e:
+            entry.update({'elapsed': time.monotonic() - start, 'error': str(e)})
+            self._write(entry)
+            raise
+
+        entry.update({'elapsed': time.monotonic() - start, 'response': redact(serialize(response, typed=True))})
+        self._write(entry)
+        return response
+
+    def replay(self, action):
+        with self._lock:
+            if not self._recordings[action]:
+                raise Exception(f'[ERROR] - No recording left for {action}')
+            entry = self._recordings[action].popleft()
+
+        if self.latency_scale:
+            time.sleep(entry['elapsed'] * self.latency_scale)
+
+        if 'error' in entry:
+            raise Exception(f'[ERROR] - Error calling {action}: {entry["error"]}')
+
+        return RecordedResponse.build(entry['response'])
@@ -1,26 +1,50 @@
 import datetime
 import logging
-import requests
+import threading
 
-from zeep import Client
-from zeep.exceptions import Fault
-from zeep.transports import Transport
-
-from sythonlab_cubacel_sdk.constants import ActionsEnum
+from sythonlab_cubacel_sdk.constants import ActionsEnum, READ_ONLY_ACTIONS
+from sythonlab_cubacel_sdk.hedging import HedgePolicy
+from sythonlab_cubacel_sdk.recording import TrafficRecorder
 from sythonlab_cubacel_sdk.sdk_config import CubacelSDKConfig
+from sythonlab_cubacel_sdk.traffic import TrafficStats, count_response, track
 
-session = requests.Session()
-session.verify = False
+# requests and zeep are imported on first use to keep the import of this module cheap.
+session = None
+_session_lock = threading.Lock()
 
 logger = logging.getLogger(__name__)
 
 
+def get_session():
+    global session
+    with _session_lock:
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            session.verify = False
+            session.hooks['response'].append(count_response)
+    return session
+
+
+def build_client(wsdl, compress_requests=False):
+    from zeep import Client
+    from zeep.transports import Transport
+
+    if compress_requests:
+        from sythonlab_cubacel_sdk.transport import CompressedTransport as Transport
+
+    return Client(wsdl, transport=Transport(session=get_session()))
+
+
 class CubacelSDK:
-    CONFIG = None
-    AUTH_SERVICE = None
-    SALES_SERVICE = None
-    TOKEN = None
-    CLIENT = None
+    """
+        Client for the Cubacel services.
+
+        An instance is thread-safe and is meant to be shared by a whole worker pool: the session
+        ticket and the SOAP clients are created once, under a lock, by the first thread that needs
+        them, and every other thread reuses them.
+    """
     DOCUMENT_TYPES = {
         'passport': 9,
         'dni': 1,
@@ -28,8 +52,44 @@ class CubacelSDK:
     }
 
     def __init__(self, custom_config_file=None, *args, **kwargs):
+        self.CONFIG = None
+        self.AUTH_SERVICE = None
+        self.SALES_SERVICE = None
+        self.CLIENT = None
+        self.AUTH_CLIENT = None
+        self.HEDGE_POLICY = None
+        self.RECORDER = None
+        self.TRAFFIC = TrafficStats()
+        self._TOKEN = None
+        self._lock = threading.RLock()
+
         self.configure(custom_config_file)
-        client = Client(self.AUTH_SERVICE, transport=Transport(session=session))
+
+        if self.RECORDER and self.RECORDER.replaying:
+            self.TOKEN = 'replay'
+
+    @property
+    def TOKEN(self):
+        if not self._TOKEN:
+            self.refresh_token(None)
+        return self._TOKEN
+
+    @TOKEN.setter
+    def TOKEN(self, value):
+        self._TOKEN = value
+
+    def login(self):
+        """
+            Request a new session ticket with the configured credentials.
+
+            It is called on the first operation that needs a ticket, so creating the SDK does not
+            touch the network. The new ticket replaces the old one atomically for all threads; use
+            refresh_token to replace an expired ticket without logging in once per thread.
+
+            Returns:
+                str: The session ticket.
+        """
+        from zeep.exceptions import Fault
 
         try:
             data = {
@@ -40,29 +100,110 @@ class CubacelSDK:
             if self.CONFIG.VERBOSE_ENABLED:
                 print('GetSessionTicket Request', data)
 
-            self.TOKEN = client.service.GetSessionTicket(**data).SessionTicket.Ticket
+            with self._lock:
+                auth_client = self.auth_client
+                with track(self.TRAFFIC, 'login'):
+                    token = auth_client.service.GetSessionTicket(**data).SessionTicket.Ticket
+                self.TOKEN = token
 
             if self.CONFIG.VERBOSE_ENABLED:
-                print('GetSessionTicket Response', self.TOKEN)
+                print('GetSessionTicket Response', token)
 
+            return token
         except Fault as e:
             print('[ERROR] - Error SOAP', e)
             print('[ERROR] - Error code', e.code)
             print('[ERROR] - Error message', e.message)
             raise
 
+    def refresh_token(self, expired_token):
+        """
+            Replace an expired session ticket, logging in only once for all threads.
+
+            Threads that find the same expired ticket wait for the first one to log in and reuse
+            the ticket it got, instead of logging in again one after another.
+
+            Args:
+                expired_token (str): The ticket the caller was using when it expired.
+
+            Returns:
+                str: The current session ticket.
+
+            Example:
+                token = obj.TOKEN
+                ...
+                token = obj.refresh_token(token)
+        """
+        with self._lock:
+            if self._TOKEN != expired_token:
+                return self._TOKEN
+            return self.login()
+
+    def warmup(self):
+        """
+            Log in, unless there is a ticket already, and load the WSDL of both services up front.
+
+            Useful for long-running processes that prefer to pay the startup cost before the
+            first operation instead of on it.
+
+            Example:
+                cubacel = CubacelSDK()
+                cubacel.warmup()
+        """
+        if self.RECORDER and self.RECORDER.replaying:
+            return
+
+        self.TOKEN
+        self.client
+
     def configure(self, custom_config_file):
         self.CONFIG = CubacelSDKConfig(custom_config_file=custom_config_file)
         self.AUTH_SERVICE = f"{self.CONFIG.HOST}/VirtualPayment/AuthenticationService.svc?wsdl"
         self.SALES_SERVICE = f"{self.CONFIG.HOST}/VirtualPayment/SalesService.svc?wsdl"
 
+        if self.CONFIG.HEDGE_ENABLED:
+            self.HEDGE_POLICY = HedgePolicy(
+                delay=self.CONFIG.HEDGE_DELAY_MS / 1000 if self.CONFIG.HEDGE_DELAY_MS else None,
+                percentile=self.CONFIG.HEDGE_PERCENTILE,
+                max_extra_ratio=self.CONFIG.HEDGE_MAX_RATIO,
+                max_workers=self.CONFIG.HEDGE_MAX_WORKERS
+            )
+
+        if self.CONFIG.TRANSPORT_MODE:
+            self.RECORDER = TrafficRecorder(
+                self.CONFIG.TRANSPORT_FILE,
+                self.CONFIG.TRANSPORT_MODE,
+                latency_scale=self.CONFIG.REPLAY_LATENCY_SCALE,
+                append=self.CONFIG.TRANSPORT_APPEND
+            )
+
     @property
     def client(self):
         if not self.CLIENT:
-            self.CLIENT = Client(self.SALES_SERVICE, transport=Transport(session=session))
+            with self._lock:
+                if not self.CLIENT:
+                    with track(self.TRAFFIC, 'wsdl'):
+                        self.CLIENT = build_client(self.SALES_SERVICE, self.CONFIG.COMPRESS_REQUESTS)
         return self.CLIENT
 
+    @property
+    def auth_client(self):
+        if not self.AUTH_CLIENT:
+            with self._lock:
+                if not self.AUTH_CLIENT:
+                    with track(self.TRAFFIC, 'wsdl'):
+                        self.AUTH_CLIENT = build_client(self.AUTH_SERVICE, self.CONFIG.COMPRESS_REQUESTS)
+        return self.AUTH_CLIENT
+
     def execute(self, action, data, client=None):
+        if self.RECORDER and self.RECORDER.replaying:
+            response = self.RECORDER.replay(action)
+
+            if self.CONFIG.VERBOSE_ENABLED:
+                print(f'[OK] - {action} Replayed response', response)
+
+            return response
+
         if not client:
             client = self.client
 
@@ -88,7 +229,18 @@ class CubacelSDK:
             print(f'{actions[action].__name__} Request', data)
 
         try:
-            response = actions[action](**data)
+            if self.HEDGE_POLICY and action in READ_ONLY_ACTIONS:
+                def send():
+                    return self.HEDGE_POLICY.call(action, actions[action], data)
+            else:
+                def send():
+                    return actions[action](**data)
+
+            with track(self.TRAFFIC, action):
+                if self.RECORDER:
+                    response = self.RECORDER.record(action, data, send)
+                else:
+                    response = send()
 
             if self.CONFIG.VERBOSE_ENABLED:
                 print(f'[OK] - {actions[action].__name__} Response', response)
@@ -98,6 +250,20 @@ class CubacelSDK:
             print(f'[ERROR] - Error calling {actions[action].__name__}: {e}')
             raise Exception(f'[ERROR] - Error calling {actions[action].__name__}: {e}')
 
+    def get_traffic_stats(self):
+        """
+            Return the bytes sent and received on the wire per operation.
+
+            Returns:
+                dict: Operation name mapped to a dict with 'requests', 'sent_bytes' and 'received_bytes'.
+                    WSDL downloads are reported under 'wsdl' and the session ticket request under 'login'.
+
+            Example:
+                stats = obj.get_traffic_stats()
+                print(stats['get_offices']['received_bytes'])
+        """
+        return self.TRAFFIC.snapshot()
+
     def sale_sim_tur(self, name, passport, nationality_id, commercial_office_id, province_id, arrival_date,
                      pick_up_airport, transaction_id=None, document_type='passport'):
         """
@@ -426,17 +592,19 @@ class CubacelSDK:
             else:
                 print("Password change failed")
         """
-        auth_client = Client(self.AUTH_SERVICE, transport=Transport(session=session))
         data = {
             'SessionTicket': self.TOKEN,
             'OldPassword': old_password,
             'NewPassword': new_password
         }
 
+        auth_client = None if self.RECORDER and self.RECORDER.replaying else self.auth_client
         response = self.execute(ActionsEnum.CHANGE_PASSWORD.value, data, auth_client)
 
         if response.ValueOk:
-            self.CONFIG.change_password(new_password)
+            # A replayed response must not overwrite the real configuration.
+            if not (self.RECORDER and self.RECORDER.replaying):
+                self.CONFIG.change_password(new_password)
             return {
                 'done': True,
                 'response': response
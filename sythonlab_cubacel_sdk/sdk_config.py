@@ -32,6 +32,16 @@ class CubacelSDKConfig:
         self.MAX_BATCH_SIM_TUR = os.getenv('CUBACEL_MAX_BATCH_SIMTUR', '')
         self.ENVIRONMENT = os.getenv('CUBACEL_ENVIRONMENT', '')
         self.VERBOSE_ENABLED = bool(int(os.getenv('CUBACEL_VERBOSE_ENABLED', '0')))
+        self.HEDGE_ENABLED = bool(int(os.getenv('CUBACEL_HEDGE_ENABLED', '0')))
+        self.HEDGE_DELAY_MS = int(os.getenv('CUBACEL_HEDGE_DELAY_MS', '0'))
+        self.HEDGE_PERCENTILE = float(os.getenv('CUBACEL_HEDGE_PERCENTILE', '95'))
+        self.HEDGE_MAX_RATIO = float(os.getenv('CUBACEL_HEDGE_MAX_RATIO', '0.1'))
+        self.HEDGE_MAX_WORKERS = int(os.getenv('CUBACEL_HEDGE_MAX_WORKERS', '16'))
+        self.TRANSPORT_MODE = os.getenv('CUBACEL_TRANSPORT_MODE', '')
+        self.TRANSPORT_FILE = os.getenv('CUBACEL_TRANSPORT_FILE', 'cubacel_traffic.jsonl.gz')
+        self.TRANSPORT_APPEND = bool(int(os.getenv('CUBACEL_TRANSPORT_APPEND', '0')))
+        self.COMPRESS_REQUESTS = bool(int(os.getenv('CUBACEL_COMPRESS_REQUESTS', '0')))
+        self.REPLAY_LATENCY_SCALE = float(os.getenv('CUBACEL_REPLAY_LATENCY_SCALE', '1'))
 
     def change_password(self, password):
         with self.CONFIG_FILE.open('r') as file_read:
@@ -0,0 +1,72 @@
+import contextvars
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# (TrafficStats, action) of the operation being sent by the current thread or context.
+current_traffic = contextvars.ContextVar('cubacel_traffic', default=None)
+
+
+class TrafficStats:
+    """
+        Bytes on the wire per ActionsEnum operation.
+
+        WSDL downloads are counted under 'wsdl' and the session ticket request under 'login'.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'requests': 0, 'sent_bytes': 0, 'received_bytes': 0})
+
+    def add(self, action, sent_bytes, received_bytes):
+        with self._lock:
+            stats = self._stats[action]
+            stats['requests'] += 1
+            stats['sent_bytes'] += sent_bytes
+            stats['received_bytes'] += received_bytes
+
+    def snapshot(self):
+        with self._lock:
+            return {action: dict(stats) for action, stats in self._stats.items()}
+
+
+@contextmanager
+def track(stats, action):
+    token = current_traffic.set((stats, action))
+    try:
+        yield
+    finally:
+        current_traffic.reset(token)
+
+
+def header_size(start_line, headers):
+    # Start line, one 'Name: value' line per header and the blank line that ends them, all CRLF terminated.
+    return len(start_line) + 2 + sum(len(f'{name}: {value}') + 2 for name, value in headers.items()) + 2
+
+
+def count_response(response, *args, **kwargs):
+    """
+        requests response hook that adds the request and response sizes to the tracked operation.
+
+        Both sizes include the start line and headers. The response body is counted as the number of
+        bytes read from the socket, which is the compressed size when the server answers with gzip or
+        deflate.
+    """
+    traffic = current_traffic.get()
+    if traffic is None:
+        return
+
+    stats, action = traffic
+    body = response.request.body or b''
+    # Read the body so the raw stream reports every byte received.
+    content = response.content
+    received = response.raw.tell() if hasattr(response.raw, 'tell') else len(content)
+    version = {10: 'HTTP/1.0', 11: 'HTTP/1.1'}.get(getattr(response.raw, 'version', 11), 'HTTP/1.1')
+    headers = dict(response.request.headers)
+    # http.client adds the Host header after the request hooks see the headers.
+    headers.setdefault('Host', urlsplit(response.request.url).netloc)
+    sent = header_size(f'{response.request.method} {response.request.path_url} HTTP/1.1', headers)
+    received += header_size(f'{version} {response.status_code} {response.reason}',
+                            getattr(response.raw, 'headers', response.headers))
+    stats.add(action, sent + len(body), received)
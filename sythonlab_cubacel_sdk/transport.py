@@ -0,0 +1,36 @@
+import gzip
+
+from zeep.transports import Transport
+
+
+class GzipRequestSession:
+    """
+        Wrapper of a requests session that gzips the body of POST requests.
+
+        The body is compressed here, after zeep has logged the plain XML message.
+    """
+
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def post(self, url, data=None, **kwargs):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        headers = dict(kwargs.pop('headers', None) or {}, **{'Content-Encoding': 'gzip'})
+        return self._session.post(url, data=gzip.compress(data), headers=headers, **kwargs)
+
+
+class CompressedTransport(Transport):
+    """
+        zeep transport that gzips SOAP request bodies.
+
+        Only useful when the Cubacel host accepts 'Content-Encoding: gzip' requests.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = GzipRequestSession(self.session)
@@ -0,0 +1,24 @@
+import pytest
+
+from sythonlab_cubacel_sdk.sdk import CubacelSDK
+from tests.server import CubacelStandInServer
+
+
+@pytest.fixture
+def server():
+    with CubacelStandInServer() as server:
+        yield server
+
+
+@pytest.fixture
+def make_sdk(server, tmp_path, monkeypatch):
+    monkeypatch.setenv('CUBACEL_HOST', server.host)
+    monkeypatch.setenv('CUBACEL_USERNAME', 'user')
+    monkeypatch.setenv('CUBACEL_PASSWORD', 'secret')
+
+    def make(**env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, str(value))
+        return CubacelSDK(custom_config_file=tmp_path / 'cubacel.json')
+
+    return make
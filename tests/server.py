@@ -0,0 +1,294 @@
+"""
+    Local stand-in for the Cubacel SOAP services, used by the tests and the benchmarks.
+
+    It serves a minimal WSDL for the authentication and sales services, answers every operation
+    with a successful result and counts logins, calls and WSDL downloads.
+"""
+import gzip
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# CubacelSDK.execute looks up every operation on the client it is given, so both services expose all of them.
+OPERATIONS = (
+    'GetSessionTicket', 'ChangeAccountPassword', 'SalePackage', 'GetPackages', 'GetProvinces', 'GetNationalities',
+    'GetCommercialOffices', 'GetSale', 'SaleRecharge', 'GetBalance', 'SellBatchPackage', 'GetSaleBatch', 'CancelSale',
+    'SuppleCustInfo', 'GetIdentificationTypes',
+)
+
+NAMESPACE = 'http://tempuri.org/'
+BALANCE = '1500.50'
+
+WSDL = """<?xml version="1.0" encoding="utf-8"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:tns="{ns}" targetNamespace="{ns}">
+  <wsdl:types>
+    <xs:schema elementFormDefault="qualified" targetNamespace="{ns}">
+      <xs:complexType name="SessionTicketType">
+        <xs:sequence><xs:element name="Ticket" type="xs:string" minOccurs="0"/></xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="ResultType">
+        <xs:sequence><xs:element name="ValueOk" type="xs:boolean"/></xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="ItemType">
+        <xs:sequence>
+          <xs:element name="Id" type="xs:int"/>
+          <xs:element name="Name" type="xs:string"/>
+          <xs:element name="Description" type="xs:string"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="ResultDataType">
+        <xs:sequence>
+          <xs:element name="Result" type="tns:ResultType"/>
+          <xs:element name="SessionTicket" type="tns:SessionTicketType" minOccurs="0"/>
+          <xs:element name="ValueOk" type="xs:boolean" minOccurs="0"/>
+          <xs:element name="OrderId" type="xs:long" minOccurs="0"/>
+          <xs:element name="Balance" type="xs:decimal" minOccurs="0"/>
+          <xs:element name="Items" minOccurs="0">
+            <xs:complexType>
+              <xs:sequence><xs:element name="Item" type="tns:ItemType" maxOccurs="unbounded"/></xs:sequence>
+            </xs:complexType>
+          </xs:element>
+        </xs:sequence>
+      </xs:complexType>
+      {elements}
+    </xs:schema>
+  </wsdl:types>
+  {messages}
+  <wsdl:portType name="ServicePortType">{port_operations}</wsdl:portType>
+  <wsdl:binding name="ServiceBinding" type="tns:ServicePortType">
+    <soap:binding transport="http://schemas.xmlsoap.org/soap/http"/>
+    {binding_operations}
+  </wsdl:binding>
+  <wsdl:service name="Service">
+    <wsdl:port name="ServicePort" binding="tns:ServiceBinding"><soap:address location="{address}"/></wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+"""
+
+ELEMENTS = """
+      <xs:element name="{op}">
+        <xs:complexType>
+          <xs:sequence>
+{request_fields}
+          </xs:sequence>
+        </xs:complexType>
+      </xs:element>
+      <xs:element name="{op}Response">
+        <xs:complexType>
+          <xs:sequence><xs:element name="{op}Result" type="tns:ResultDataType"/></xs:sequence>
+        </xs:complexType>
+      </xs:element>"""
+
+MESSAGES = """
+  <wsdl:message name="{op}Input"><wsdl:part name="parameters" element="tns:{op}"/></wsdl:message>
+  <wsdl:message name="{op}Output"><wsdl:part name="parameters" element="tns:{op}Response"/></wsdl:message>"""
+
+PORT_OPERATION = """
+    <wsdl:operation name="{op}">
+      <wsdl:input message="tns:{op}Input"/><wsdl:output message="tns:{op}Output"/>
+    </wsdl:operation>"""
+
+BINDING_OPERATION = """
+    <wsdl:operation name="{op}">
+      <soap:operation soapAction="{ns}{op}" style="document"/>
+      <wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>"""
+
+RESPONSE = """<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body><{op}Response xmlns="{ns}"><{op}Result>{content}</{op}Result></{op}Response></s:Body>
+</s:Envelope>"""
+
+
+REQUEST_FIELDS = (
+    'AccountId', 'Password', 'OldPassword', 'NewPassword', 'SessionTicket', 'OrderId', 'TransactionId', 'ProvinceId',
+    'RechargeData', 'PackageData', 'BatchData', 'ArrivalDate', 'CertificateID', 'CertificateType', 'DateOfBirth',
+    'FirstLastName', 'FirstName', 'Gender', 'HomeAddress', 'ICCID', 'NationalityID',
+)
+
+
+def build_wsdl(operations, address):
+    # Request fields are untyped: the stand-in does not validate what the SDK sends.
+    request_fields = '\n'.join(
+        f'            <xs:element name="{field}" type="xs:anyType" minOccurs="0"/>' for field in REQUEST_FIELDS
+    )
+
+    def render(template):
+        return ''.join(template.format(op=op, ns=NAMESPACE, request_fields=request_fields) for op in operations)
+
+    return WSDL.format(ns=NAMESPACE, address=address, elements=render(ELEMENTS), messages=render(MESSAGES),
+                       port_operations=render(PORT_OPERATION), binding_operations=render(BINDING_OPERATION))
+
+
+def build_content(operation, items):
+    content = '<Result><ValueOk>true</ValueOk></Result>'
+    if operation == 'GetSessionTicket':
+        content += '<SessionTicket><Ticket>ticket-{}</Ticket></SessionTicket>'
+    elif operation == 'ChangeAccountPassword':
+        content += '<ValueOk>true</ValueOk>'
+    elif operation == 'GetBalance':
+        content += f'<Balance>{BALANCE}</Balance>'
+    elif operation in ('GetNationalities', 'GetCommercialOffices', 'GetPackages', 'GetProvinces'):
+        content += '<Items>' + ''.join(
+            f'<Item><Id>{i}</Id><Name>{operation} item {i}</Name>'
+            f'<Description>Description of {operation} item number {i}</Description></Item>'
+            for i in range(items)
+        ) + '</Items>'
+    else:
+        content += '<OrderId>1</OrderId>'
+    return content
+
+
+class CubacelStandInServer(ThreadingHTTPServer):
+    """
+        Args:
+            latency (float): Seconds added to every SOAP response.
+            items (int): Items returned by the catalog operations.
+            compress (bool): Compress responses when the client accepts gzip or deflate.
+            bandwidth (int, optional): Bytes per second of the simulated link, for request and response bodies.
+    """
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, latency=0.0, items=200, compress=True, bandwidth=None):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.latency = latency
+        self.items = items
+        self.compress = compress
+        self.bandwidth = bandwidth
+        self.logins = 0
+        self.wsdl_loads = {}
+        self.calls = {}
+        self.compressed_requests = 0
+        self.received_bytes = 0
+        self.sent_bytes = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def host(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def transfer(self, size):
+        if self.bandwidth:
+            time.sleep(size / self.bandwidth)
+
+    def count_bytes(self, received=0, sent=0):
+        with self._lock:
+            self.received_bytes += received
+            self.sent_bytes += sent
+
+    def count(self, counter, key):
+        with self._lock:
+            counter[key] = counter.get(key, 0) + 1
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+class CountingReader:
+    """
+        Wrap the request stream to count the bytes read, start line and headers included.
+    """
+
+    def __init__(self, stream, server):
+        self.stream = stream
+        self.server = server
+
+    def read(self, *args):
+        data = self.stream.read(*args)
+        self.server.count_bytes(received=len(data))
+        return data
+
+    def readline(self, *args):
+        data = self.stream.readline(*args)
+        self.server.count_bytes(received=len(data))
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class CountingWriter:
+    """
+        Wrap the response stream to count the bytes written, status line and headers included.
+    """
+
+    def __init__(self, stream, server):
+        self.stream = stream
+        self.server = server
+
+    def write(self, data):
+        self.server.count_bytes(sent=len(data))
+        return self.stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.rfile = CountingReader(self.rfile, self.server)
+        self.wfile = CountingWriter(self.wfile, self.server)
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body, content_type):
+        body = body.encode('utf-8')
+        accepted = self.headers.get('Accept-Encoding', '')
+        encoding = None
+
+        if self.server.compress and 'gzip' in accepted:
+            body, encoding = gzip.compress(body), 'gzip'
+        elif self.server.compress and 'deflate' in accepted:
+            body, encoding = zlib.compress(body), 'deflate'
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        self.server.transfer(len(body))
+        self.wfile.write(body)
+
+    def do_GET(self):
+        service = self.path.split('?')[0]
+        self.server.count(self.server.wsdl_loads, service)
+        self._reply(build_wsdl(OPERATIONS, self.server.host + service), 'text/xml; charset=utf-8')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.transfer(len(body))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+            with self.server._lock:
+                self.server.compressed_requests += 1
+
+        operation = re.search(r'<(?:\w+:)?(\w+)[ >]', body.decode('utf-8').split('Body>', 1)[1]).group(1)
+        self.server.count(self.server.calls, operation)
+
+        content = build_content(operation, self.server.items)
+        if operation == 'GetSessionTicket':
+            with self.server._lock:
+                self.server.logins += 1
+                content = content.format(self.server.logins)
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        self._reply(RESPONSE.format(op=operation, ns=NAMESPACE, content=content), 'text/xml; charset=utf-8')
@@ -0,0 +1,61 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sythonlab_cubacel_sdk.hedging import HedgePolicy
+
+
+def test_concurrent_callers_are_not_queued_or_hedged():
+    policy = HedgePolicy(delay=0.15, max_extra_ratio=1, max_workers=8)
+
+    def operation():
+        time.sleep(0.1)
+        return 'ok'
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=64) as executor:
+        results = list(executor.map(lambda _: policy.call('get_sale', operation, {}), range(64)))
+
+    assert results == ['ok'] * 64
+    assert time.monotonic() - start < 0.3
+    assert policy.hedges == 0
+
+
+def test_hedge_wins_over_slow_request():
+    policy = HedgePolicy(delay=0.05, max_extra_ratio=1)
+    calls = []
+    lock = threading.Lock()
+
+    def operation():
+        with lock:
+            calls.append(None)
+            first = len(calls) == 1
+        time.sleep(1 if first else 0.01)
+        return 'slow' if first else 'hedge'
+
+    start = time.monotonic()
+    assert policy.call('get_sale', operation, {}) == 'hedge'
+    assert time.monotonic() - start < 0.5
+    assert policy.hedges == 1
+
+
+def test_hedges_are_capped():
+    policy = HedgePolicy(delay=0.01, max_extra_ratio=0)
+
+    def operation():
+        time.sleep(0.05)
+        return 'ok'
+
+    assert policy.call('get_sale', operation, {}) == 'ok'
+    assert policy.hedges == 0
+
+
+def test_write_operations_are_never_hedged(server, make_sdk):
+    sdk = make_sdk(CUBACEL_HEDGE_ENABLED=1, CUBACEL_HEDGE_DELAY_MS=1)
+    hedged = []
+    call = sdk.HEDGE_POLICY.call
+    sdk.HEDGE_POLICY.call = lambda action, func, data: hedged.append(action) or call(action, func, data)
+
+    assert sdk.recharge('+5351234567', 10, 1)['done']
+    assert sdk.get_balance()['done']
+    assert hedged == ['get_balance']
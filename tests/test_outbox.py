@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from sythonlab_cubacel_sdk.outbox import OperationQueue
+
+
+class FakeSDK:
+    def __init__(self, delay=0.0, down=False):
+        self.delay = delay
+        self.down = down
+        self.sent = Counter()
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def get_transaction_id(self):
+        with self._lock:
+            self._next_id += 1
+            return str(self._next_id)
+
+    def recharge(self, phone_number, price, product_code, transaction_id):
+        time.sleep(self.delay)
+        if self.down:
+            raise ConnectionError('host down')
+        with self._lock:
+            self.sent[transaction_id] += 1
+        return {'done': True, 'order_id': 1, 'transaction_id': transaction_id}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_drainer_survives_failing_callback_and_drain(tmp_path, monkeypatch):
+    sdk = FakeSDK()
+
+    def callback(transaction_id, result):
+        raise RuntimeError('callback bug')
+
+    queue = OperationQueue(sdk, tmp_path / 'queue.sqlite3', interval=0.01, retry_delay=0.01, callback=callback)
+    claim = queue._claim
+    claims = []
+
+    def flaky_claim():
+        claims.append(None)
+        if len(claims) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        return claim()
+
+    monkeypatch.setattr(queue, '_claim', flaky_claim)
+
+    queue.start()
+    first = queue.recharge('+5351234567', 10, 1)
+    assert wait_for(lambda: queue.get_result(first)['status'] == 'done')
+
+    second = queue.recharge('+5351234567', 10, 1)
+    assert wait_for(lambda: queue.get_result(second)['status'] == 'done')
+    assert queue._thread.is_alive()
+    queue.stop()
+
+
+def test_queues_sharing_a_file_send_each_operation_once(tmp_path):
+    sdk = FakeSDK(delay=0.001)
+    path = tmp_path / 'queue.sqlite3'
+    queues = [OperationQueue(sdk, path, batch_size=5, concurrency=4, interval=0) for _ in range(4)]
+    transaction_ids = [queues[0].recharge('+5351234567', 10, 1) for _ in range(200)]
+
+    for queue in queues:
+        queue.start()
+    assert wait_for(lambda: sum(sdk.sent.values()) >= 200)
+    for queue in queues:
+        queue.stop()
+
+    assert sdk.sent == Counter({transaction_id: 1 for transaction_id in transaction_ids})
+
+
+def test_operations_in_progress_are_only_reclaimed_after_the_lease(tmp_path):
+    sdk = FakeSDK()
+    path = tmp_path / 'queue.sqlite3'
+    first = OperationQueue(sdk, path, lease=0.2)
+    transaction_id = first.recharge('+5351234567', 10, 1)
+    assert len(first._claim()) == 1
+
+    second = OperationQueue(sdk, path, lease=0.2)
+    assert second.drain_once() == 0
+    assert second.get_result(transaction_id)['status'] == 'processing'
+
+    time.sleep(0.25)
+    assert second.drain_once() == 1
+    assert second.get_result(transaction_id)['status'] == 'done'
+
+
+def test_failed_operations_are_retried_until_max_age(tmp_path):
+    sdk = FakeSDK(down=True)
+    queue = OperationQueue(sdk, tmp_path / 'queue.sqlite3', retry_delay=0)
+    transaction_id = queue.recharge('+5351234567', 10, 1)
+
+    for _ in range(20):
+        queue.drain_once()
+    assert queue.get_result(transaction_id)['status'] == 'pending'
+    assert queue.get_result(transaction_id)['attempts'] == 20
+
+    sdk.down = False
+    queue.drain_once()
+    assert queue.get_result(transaction_id)['status'] == 'done'
+
+    sdk.down = True
+    queue = OperationQueue(sdk, tmp_path / 'queue.sqlite3', retry_delay=0, max_age=0.1)
+    transaction_id = queue.recharge('+5351234567', 10, 1)
+    queue.drain_once()
+    assert queue.get_result(transaction_id)['status'] == 'pending'
+
+    time.sleep(0.15)
+    queue.drain_once()
+    assert queue.get_result(transaction_id)['status'] == 'failed'
+
+
+def test_max_attempts_limits_retries(tmp_path):
+    queue = OperationQueue(FakeSDK(down=True), tmp_path / 'queue.sqlite3', retry_delay=0, max_attempts=3)
+    transaction_id = queue.recharge('+5351234567', 10, 1)
+
+    for _ in range(5):
+        queue.drain_once()
+    assert queue.get_result(transaction_id) == {
+        'status': 'failed', 'attempts': 3, 'result': None, 'error': 'host down'
+    }
@@ -0,0 +1,101 @@
+import types
+
+import pytest
+
+from sythonlab_cubacel_sdk.pipeline import BatchSimPipeline
+
+CARDS = [{'iccid': str(iccid), 'name': 'John'} for iccid in range(3)]
+
+
+class FakeSDK:
+    CONFIG = types.SimpleNamespace(MIN_BATCH_SIM_TUR='1', MAX_BATCH_SIM_TUR='100')
+
+    def __init__(self, statuses=('delivered',), sales=None, batch='done'):
+        self.statuses = list(statuses)
+        self.batch = batch
+        self.batch_calls = []
+        self.sales = sales or {}
+        self.calls = []
+        self._next_id = 0
+
+    def get_transaction_id(self):
+        self._next_id += 1
+        return str(self._next_id)
+
+    def request_batch(self, package_id, qty, commercial_office_id, delivery_date, transaction_id):
+        self.batch_calls.append(transaction_id)
+        if self.batch == 'error':
+            raise Exception('transient network')
+        if self.batch == 'rejected':
+            return {'done': False, 'response': {'Result': {'ValueOk': False}}}
+        return {'done': True, 'response': {'OrderId': 77}}
+
+    def get_batch_sale(self, order_id, transaction_id):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        if isinstance(status, Exception):
+            raise status
+        return {'done': True, 'response': {'Status': status}}
+
+    def sale_sim_tur_card(self, transaction_id, iccid, **kwargs):
+        self.calls.append((iccid, transaction_id))
+        outcome = self.sales.get(iccid, 'done')
+        if outcome == 'error':
+            raise Exception('transient network')
+        if outcome == 'rejected':
+            return {'done': False, 'response': {'Result': {'ValueOk': False}}}
+        return {'done': True, 'order_id': int(iccid), 'transaction_id': transaction_id}
+
+
+def make_pipeline(sdk, tmp_path, **kwargs):
+    return BatchSimPipeline(sdk, tmp_path / 'checkpoint.json', retry_delay=0, poll_interval=0, **kwargs)
+
+
+def test_poll_errors_are_retried(tmp_path):
+    sdk = FakeSDK(statuses=[Exception('transient network'), 'pending', 'delivered'])
+    report = make_pipeline(sdk, tmp_path).run(1, 2, '2025-08-01', CARDS)
+
+    assert report['batch_status'] == 'delivered'
+    assert [card['status'] for card in report['cards']] == ['done'] * 3
+
+
+def test_poll_times_out(tmp_path):
+    sdk = FakeSDK(statuses=[Exception('transient network'), 'pending'])
+    with pytest.raises(TimeoutError):
+        make_pipeline(sdk, tmp_path, poll_timeout=0.05).run(1, 2, '2025-08-01', CARDS)
+
+
+def test_only_errors_are_retried_and_rejections_get_new_transaction_id(tmp_path):
+    sdk = FakeSDK(sales={'1': 'error', '2': 'rejected'})
+    report = make_pipeline(sdk, tmp_path, max_attempts=3).run(1, 2, '2025-08-01', CARDS)
+    cards = {card['iccid']: card for card in report['cards']}
+
+    assert cards['1']['status'] == 'failed' and cards['1']['attempts'] == 3 and not cards['1']['rejected']
+    assert cards['2']['status'] == 'failed' and cards['2']['attempts'] == 1 and cards['2']['rejected']
+
+    sdk.sales = {}
+    sdk.calls = []
+    report = make_pipeline(sdk, tmp_path).run(1, 2, '2025-08-01', CARDS)
+    retried = dict(sdk.calls)
+
+    assert [card['status'] for card in report['cards']] == ['done'] * 3
+    assert set(retried) == {'1', '2'}
+    assert retried['1'] == cards['1']['transaction_id']
+    assert retried['2'] != cards['2']['transaction_id']
+
+
+def test_rejected_batch_gets_new_transaction_id_on_rerun(tmp_path):
+    sdk = FakeSDK(batch='rejected')
+    with pytest.raises(Exception, match='Batch request failed'):
+        make_pipeline(sdk, tmp_path).run(1, 2, '2025-08-01', CARDS)
+
+    sdk.batch = 'error'
+    with pytest.raises(Exception, match='transient network'):
+        make_pipeline(sdk, tmp_path).run(1, 2, '2025-08-01', CARDS)
+
+    sdk.batch = 'done'
+    report = make_pipeline(sdk, tmp_path).run(1, 2, '2025-08-01', CARDS)
+
+    rejected, errored, accepted = sdk.batch_calls
+    assert rejected != errored
+    assert errored == accepted == report['transaction_id']
+    assert report['order_id'] == 77
@@ -0,0 +1,81 @@
+import datetime
+import gzip
+import json
+from decimal import Decimal
+
+from sythonlab_cubacel_sdk.recording import RecordedResponse, serialize
+
+from tests.server import BALANCE
+
+
+def read_lines(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def record(make_sdk, path, **env):
+    sdk = make_sdk(CUBACEL_TRANSPORT_MODE='record', CUBACEL_TRANSPORT_FILE=path, **env)
+    sdk.get_balance()
+    sdk.get_nationalities()
+    sdk.recharge('+5351234567', 10, 1)
+    sdk.RECORDER.close()
+    return sdk
+
+
+def test_record_is_one_redacted_gzip_stream(server, make_sdk, tmp_path):
+    path = tmp_path / 'traffic.jsonl.gz'
+    sdk = record(make_sdk, path)
+
+    assert [line['action'] for line in read_lines(path)] == ['get_balance', 'get_nationalities', 'recharge']
+    assert sdk.TOKEN not in gzip.decompress(path.read_bytes()).decode('utf-8')
+    # A single gzip member: the header magic appears once.
+    assert path.read_bytes().count(b'\x1f\x8b\x08') == 1
+
+
+def test_recording_replaces_file_unless_appending(server, make_sdk, tmp_path):
+    path = tmp_path / 'traffic.jsonl.gz'
+    record(make_sdk, path)
+    record(make_sdk, path)
+    assert len(read_lines(path)) == 3
+
+    record(make_sdk, path, CUBACEL_TRANSPORT_APPEND=1)
+    assert len(read_lines(path)) == 6
+
+
+def test_replay_serves_recordings_offline(server, make_sdk, tmp_path):
+    path = tmp_path / 'traffic.jsonl.gz'
+    record(make_sdk, path)
+    calls = dict(server.calls)
+
+    sdk = make_sdk(CUBACEL_TRANSPORT_MODE='replay', CUBACEL_TRANSPORT_FILE=path, CUBACEL_REPLAY_LATENCY_SCALE=0)
+
+    balance = sdk.get_balance()['balance']
+    assert isinstance(balance, Decimal) and balance == Decimal(BALANCE)
+    assert len(sdk.get_nationalities().Items['Item']) == server.items
+    assert sdk.recharge('+5351234567', 10, 1)['done']
+    assert server.calls == calls
+    assert server.logins == 1
+
+
+def test_replayed_change_password_keeps_config(server, make_sdk, tmp_path):
+    path = tmp_path / 'traffic.jsonl.gz'
+    sdk = make_sdk(CUBACEL_TRANSPORT_MODE='record', CUBACEL_TRANSPORT_FILE=path)
+    assert sdk.change_password('secret', 'recorded')['done']
+    sdk.RECORDER.close()
+
+    sdk = make_sdk(CUBACEL_TRANSPORT_MODE='replay', CUBACEL_TRANSPORT_FILE=path, CUBACEL_REPLAY_LATENCY_SCALE=0)
+    assert sdk.change_password('recorded', 'replayed')['done']
+    assert json.loads(sdk.CONFIG.CONFIG_FILE.read_text())['password'] == 'recorded'
+
+
+def test_typed_values_round_trip():
+    value = {
+        'Balance': Decimal('10.25'),
+        'Sale': {'Date': datetime.datetime(2025, 8, 1, 10, 30), 'Day': datetime.date(2025, 8, 1)},
+        'Times': [datetime.time(9, 15)],
+    }
+    replayed = RecordedResponse.build(json.loads(json.dumps(serialize(value, typed=True))))
+
+    assert replayed == value
+    assert type(replayed.Balance) is Decimal
+    assert type(replayed.Sale['Day']) is datetime.date
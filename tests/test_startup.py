@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+
+def test_import_does_not_load_zeep():
+    code = 'import sys, sythonlab_cubacel_sdk.sdk; print("zeep" in sys.modules, "requests" in sys.modules)'
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert output.split() == ['False', 'False']
+
+
+def test_sdk_logs_in_lazily(server, make_sdk):
+    sdk = make_sdk()
+    assert sdk.get_transaction_id()
+    assert server.logins == 0
+    assert server.wsdl_loads == {}
+
+
+def test_warmup_reuses_existing_ticket(server, make_sdk):
+    sdk = make_sdk()
+    sdk.warmup()
+    sdk.warmup()
+
+    assert server.logins == 1
+    assert sorted(server.wsdl_loads.values()) == [1, 1]
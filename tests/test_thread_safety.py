@@ -0,0 +1,46 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from tests.server import BALANCE
+
+THREADS = 32
+CALLS = 2000
+
+
+def test_shared_sdk_under_concurrent_calls(server, make_sdk):
+    sdk = make_sdk()
+    start = threading.Barrier(THREADS)
+
+    def call(i):
+        if i < THREADS:
+            start.wait()
+        return sdk.get_balance()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        results = list(executor.map(call, range(CALLS)))
+
+    assert all(result['done'] and result['balance'] == Decimal(BALANCE) for result in results)
+    assert server.logins == 1
+    assert server.wsdl_loads == {
+        '/VirtualPayment/AuthenticationService.svc': 1,
+        '/VirtualPayment/SalesService.svc': 1,
+    }
+    assert server.calls['GetBalance'] == CALLS
+
+
+def test_concurrent_refresh_logs_in_once(server, make_sdk):
+    sdk = make_sdk()
+    expired = sdk.TOKEN
+    start = threading.Barrier(THREADS)
+
+    def refresh(_):
+        start.wait()
+        return sdk.refresh_token(expired)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        tokens = set(executor.map(refresh, range(THREADS)))
+
+    assert server.logins == 2
+    assert tokens == {sdk.TOKEN}
+    assert sdk.TOKEN != expired
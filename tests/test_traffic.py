@@ -0,0 +1,36 @@
+import logging
+
+
+def test_received_bytes_are_bytes_on_the_wire(server, make_sdk):
+    server.compress = False
+    plain = make_sdk()
+    plain.get_nationalities()
+
+    server.compress = True
+    compressed = make_sdk()
+    compressed.get_nationalities()
+
+    plain_bytes = plain.get_traffic_stats()['get_nationalities']['received_bytes']
+    compressed_bytes = compressed.get_traffic_stats()['get_nationalities']['received_bytes']
+    assert compressed_bytes * 5 < plain_bytes
+    assert compressed.get_traffic_stats()['wsdl']['requests'] == 2
+    assert compressed.get_traffic_stats()['login']['requests'] == 1
+
+
+def test_compressed_requests_with_zeep_debug_logging(server, make_sdk, caplog):
+    caplog.set_level(logging.DEBUG, logger='zeep.transports')
+    sdk = make_sdk(CUBACEL_COMPRESS_REQUESTS=1)
+
+    assert sdk.get_balance()['done']
+    assert server.compressed_requests == 2
+    assert 'GetBalance' in caplog.text
+
+
+def test_bytes_include_start_line_and_headers(server, make_sdk):
+    sdk = make_sdk()
+    sdk.get_nationalities()
+    sdk.get_balance()
+
+    stats = sdk.get_traffic_stats().values()
+    assert sum(action['sent_bytes'] for action in stats) == server.received_bytes
+    assert sum(action['received_bytes'] for action in stats) == server.sent_bytes